@@ -1,12 +1,134 @@
 import atexit
+import functools
+import hashlib
+import os
+import re
 import shutil
-import signal
 import subprocess
-import sys
+import tarfile
 import tempfile
-from pathlib import Path
+import threading
+import urllib.request
+import weakref
+from collections.abc import Callable
+from pathlib import Path, PurePosixPath
 from typing import Any
 
+# Safe tar extraction filter, only available from Python 3.11.4 onwards
+_TAR_EXTRACT_KWARGS: dict[str, Any] = (
+    {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+)
+
+# Files git writes in place, which must not be hardlinked between a clone and the cache
+_CACHE_IGNORE = shutil.ignore_patterns("FETCH_HEAD", "logs")
+
+# The symref line of `git ls-remote --symref <url> HEAD`
+_DEFAULT_BRANCH_RE = re.compile(rb"^ref:\s+refs/heads/(\S+)\s+HEAD", re.M)
+
+# Threads still deleting temporary directories, waited for on interpreter exit
+_cleanup_threads: set[threading.Thread] = set()
+
+
+def _start_cleanup_thread(remove: Callable[[], None]) -> threading.Thread:
+    """Run a temporary directory deletion in a background thread.
+
+    Args:
+        remove: The function that deletes the directory.
+
+    Returns:
+        The started thread.
+    """
+
+    def run() -> None:
+        try:
+            remove()
+        except Exception:
+            # Ignore cleanup errors to prevent issues during shutdown
+            pass
+        finally:
+            _cleanup_threads.discard(thread)
+
+    thread = threading.Thread(target=run, daemon=True)
+    _cleanup_threads.add(thread)
+    thread.start()
+    return thread
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hardlink a file, falling back to a copy (e.g. across filesystems).
+
+    Args:
+        src: The file to link or copy.
+        dst: The destination path.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _cleanup_tempdir(
+    temp_dir: "tempfile.TemporaryDirectory[str]", background: bool = False
+) -> threading.Thread | None:
+    """Delete a downloader's temporary directory, ignoring any errors.
+
+    In the background, the directory is first moved aside so it disappears right
+    away, and then deleted in a separate thread.
+
+    Args:
+        temp_dir: The temporary directory to delete.
+        background: If True, delete the directory in a background thread.
+
+    Returns:
+        The thread deleting the directory, if deleting in the background.
+    """
+    try:
+        if not background:
+            temp_dir.cleanup()
+            return None
+
+        trash_dir = f"{temp_dir.name}.trash"
+        try:
+            os.rename(temp_dir.name, trash_dir)
+        except OSError:
+            # Can't move it (e.g. files still open on Windows), delete it in place
+            remove = temp_dir.cleanup
+        else:
+            # Nothing left at the original path, this only marks it as cleaned up
+            temp_dir.cleanup()
+            remove = functools.partial(shutil.rmtree, trash_dir, ignore_errors=True)
+        return _start_cleanup_thread(remove)
+    except Exception:
+        # Ignore cleanup errors to prevent issues during shutdown
+        return None
+
+
+def _stop_git_batch(proc: "subprocess.Popen[bytes]") -> None:
+    """Stop a `git cat-file --batch-check` process and close its pipes.
+
+    Args:
+        proc: The process to stop.
+    """
+    assert proc.stdin is not None
+    assert proc.stdout is not None
+    try:
+        # git exits on its own once its stdin is closed
+        proc.stdin.close()
+        proc.wait(timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        proc.kill()
+        proc.wait()
+    proc.stdout.close()
+
+
+def _wait_for_cleanup_threads() -> None:
+    """Wait for all background deletions to finish."""
+    for thread in list(_cleanup_threads):
+        thread.join()
+
+
+atexit.register(_wait_for_cleanup_threads)
+
 
 class GithubFastDownloader:
     """A class for efficiently downloading specific files and directories from GitHub repositories.
@@ -19,17 +141,30 @@ class GithubFastDownloader:
         repo_owner: The owner (user or organization) of the GitHub repository.
         repo_url: The full HTTPS URL to the git repository.
         repo_branch: The branch to checkout (defaults to repository's default branch).
+        filter_spec: The partial clone filter used when cloning.
+        cache_dir: Directory clones are cached in across runs, if any.
         git_bin: Path to the git binary executable.
         temp_dir: Temporary directory object for storing the repository.
         repo_dir: Path to the cloned repository within the temporary directory.
     """
 
+    # Config passed to every git call: HTTP/2 for fewer connections and handshakes,
+    # and all cores for resolving deltas of fetched packs
+    _GIT_FAST_OPTS = [
+        "-c",
+        "http.version=HTTP/2",
+        "-c",
+        "pack.threads=0",
+    ]
+
     def __init__(
         self,
         repo_name: str,
         repo_owner: str,
         repo_branch: str | None = None,
         git_bin: str | None = "git",
+        filter_spec: str = "tree:0",
+        cache_dir: Path | str | None = None,
     ) -> None:
         """Initialize the GithubFastDownloader.
 
@@ -38,6 +173,16 @@ class GithubFastDownloader:
             repo_owner: The owner (user or organization) of the repository.
             repo_branch: The branch to checkout. If None, uses the repository's default branch.
             git_bin: Path to git binary. If None, searches for 'git' in PATH.
+            filter_spec: The partial clone filter passed to git clone. The default
+                'tree:0' fetches trees as well as file contents lazily, which requires
+                the server to allow filters and fetching any object by SHA-1
+                (uploadpack.allowFilter and uploadpack.allowAnySHA1InWant), as
+                github.com does. Use 'blob:none' for servers that do not.
+            cache_dir: Directory to cache clones in across runs. If set, a clone of the
+                same repository, branch and filter is reused from the cache, and only
+                updated with a shallow fetch, instead of cloning from scratch every
+                time. cleanup() writes the clone back to the cache, including the file
+                contents fetched for checkouts.
 
         Raises:
             ValueError: If git_bin is None and git cannot be found in PATH.
@@ -54,163 +199,558 @@ class GithubFastDownloader:
         self.repo_owner = repo_owner
         self.repo_url = f"https://github.com/{self.repo_owner}/{self.repo_name}.git"
         self.repo_branch = repo_branch
-        self.temp_dir = tempfile.TemporaryDirectory(prefix="github_fast_downloader__")
+        self.filter_spec = filter_spec
+        self.cache_dir = (
+            Path(cache_dir).expanduser() if cache_dir is not None else None
+        )
+        self.temp_dir = tempfile.TemporaryDirectory(
+            prefix="github_fast_downloader__", ignore_cleanup_errors=True
+        )
         self.repo_dir = Path(self.temp_dir.name) / "repo"
-        self._cleaned_up = False
+        self._cleanup_thread: threading.Thread | None = None
+        self._cloned = False
+        self._cache_git_dir: Path | None = None
+        self._archived = False
+        self._repo_dir_verified = False
+        self._default_branch: str | None = None
+
+        # Delete the temporary directory when the instance is garbage collected or on
+        # interpreter exit, unless cleanup() was called first
+        self._finalizer = weakref.finalize(self, _cleanup_tempdir, self.temp_dir)
+
+        # Long-lived `git cat-file --batch-check` process, started on first use
+        self._git_batch: "subprocess.Popen[bytes] | None" = None
+        self._git_batch_lock = threading.Lock()
+        self._git_batch_finalizer: weakref.finalize | None = None
+
+        # Items recorded by deferred checkout_stuff() calls, applied by flush()
+        self._pending: list[str] = []
+        self._pending_reset = False
+
+        # In-memory copy of the sparse-checkout list, to skip redundant checkouts
+        self._current_patterns: list[str] = []
+        self._working_tree_stale = False
+
+        # Template directory for the clone, so the sparse-checkout patterns requested
+        # before cloning are already in place when git checks out the working tree
+        self._template_dir = Path(self.temp_dir.name) / "template"
+        (self._template_dir / "info").mkdir(parents=True)
+        (self._template_dir / "info" / "sparse-checkout").touch()
+
+    def _run_git(
+        self,
+        args: list[str],
+        input: str | None = None,
+        capture_stdout: bool = False,
+        text: bool = True,
+    ) -> "subprocess.CompletedProcess[Any]":
+        """Run a git command non-interactively.
+
+        stdout is discarded unless requested, so progress output is never buffered in
+        memory, while stderr is always captured for error messages.
+
+        Args:
+            args: The arguments to pass to git.
+            input: Text to send to the command's stdin.
+            capture_stdout: If True, capture stdout instead of discarding it.
+            text: If False, stdin and the captured output are bytes, not decoded.
+
+        Returns:
+            The completed process.
 
-        # Register the cleanup function for various terminations
-        atexit.register(self.cleanup)
-        signal.signal(signal.SIGINT, self.signal_handler)
+        Raises:
+            subprocess.CalledProcessError: If the git command fails.
+        """
+        return subprocess.run(
+            [self.git_bin, *self._GIT_FAST_OPTS, *args],
+            input=input,
+            check=True,
+            stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=text,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
 
     def clone_repo(self) -> None:
         """Clone the GitHub repository with sparse checkout enabled.
 
-        This performs a shallow clone (depth=1) without checking out files initially,
-        and uses blob filtering to minimize data transfer.
+        This performs a shallow clone (depth=1) with sparse checkout enabled, and
+        uses partial clone filtering to minimize data transfer. Only the items passed
+        to checkout_stuff() before cloning are checked out, so the working tree is
+        empty if nothing was requested yet.
+
+        If no branch was given, the remote's HEAD is cloned and repo_branch is set
+        from the local clone afterwards, avoiding a separate query to the remote.
+
+        If a cache_dir was given and it holds a clone of the same repository, branch
+        and filter, that clone is hardlinked into place and brought up to date with a
+        shallow fetch instead. If that fails, the repository is cloned from GitHub as
+        usual. Either way, cleanup() writes the clone back to the cache.
 
         Raises:
+            ValueError: If archive_paths() was used on this instance.
             RuntimeError: If the git clone operation fails.
         """
+        if self._archived:
+            raise ValueError("clone_repo() can't be used after archive_paths()")
+
+        # Write any deferred items to the template so the clone checks them out
+        self.flush()
+
+        self._cache_git_dir = self._cached_git_dir()
+        from_cache = False
+        if self._cache_git_dir is not None and self._cache_git_dir.is_dir():
+            try:
+                self._clone_from_cache(self._cache_git_dir)
+                from_cache = True
+            except RuntimeError:
+                # e.g. a broken cache entry or one replaced while copying it
+                shutil.rmtree(self.repo_dir, ignore_errors=True)
+        if not from_cache:
+            self._clone_from_remote()
+        self._cloned = True
+        self._repo_dir_verified = True
+
         if not self.repo_branch:
-            self.repo_branch = self.get_default_branch()
+            # Read the checked out branch from the local HEAD, no git call needed
+            head = (self.repo_dir / ".git" / "HEAD").read_text(encoding="utf-8")
+            if head.startswith("ref: refs/heads/"):
+                self.repo_branch = head.removeprefix("ref: refs/heads/").strip()
+                self._default_branch = self.repo_branch
+
+    def _clone_from_remote(self) -> None:
+        """Clone the repository from GitHub.
+
+        Raises:
+            RuntimeError: If the git clone operation fails.
+        """
+        # Without --branch, git clone checks out the remote's default branch
+        branch_args = ["--branch", self.repo_branch] if self.repo_branch else []
 
         try:
             # Shallow clone the repository (depth=1)
-            subprocess.run(
+            self._run_git(
                 [
-                    self.git_bin,
                     "clone",
+                    "--quiet",  # no progress output
+                    "-c",
+                    "core.sparseCheckout=true",
+                    "-c",
+                    "core.sparseCheckoutCone=false",
+                    f"--template={self._template_dir}",  # pre-populated patterns
                     "--depth",
                     "1",  # shallow clone (only latest commit)
-                    "--branch",
-                    self.repo_branch,
-                    "--no-checkout",  # don't check out files initially
-                    "--filter=blob:none",  # Don't fetch file data
+                    *branch_args,
+                    f"--filter={self.filter_spec}",  # fetch objects lazily
                     self.repo_url,
                     str(self.repo_dir),
-                ],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+                ]
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(
+                f"Failed to clone repository {self.repo_url} (branch: {self.repo_branch or 'default'}): {e.stderr}"
+            ) from e
+
+    def _cached_git_dir(self) -> Path | None:
+        """The .git directory of the cached clone of this repository, branch and filter.
+
+        Returns:
+            The path, which may not exist yet, or None if no cache_dir was given.
+        """
+        if self.cache_dir is None:
+            return None
+        key = (
+            f"{self.repo_owner}/{self.repo_name}@{self.repo_branch or 'HEAD'}"
+            f"?filter={self.filter_spec}"
+        )
+        cache_key = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return self.cache_dir / cache_key / ".git"
+
+    def _clone_from_cache(self, cached_git_dir: Path) -> None:
+        """Hardlink the cached clone into place and update it to the latest commit.
+
+        Args:
+            cached_git_dir: The .git directory of the cached clone.
+
+        Raises:
+            RuntimeError: If copying the cached clone or updating it fails.
+        """
+        git_dir = self.repo_dir / ".git"
+        try:
+            # Git replaces files rather than writing through them, so hardlinks are
+            # safe, except for the few files it writes in place, which are skipped
+            shutil.copytree(
+                cached_git_dir,
+                git_dir,
+                copy_function=_link_or_copy,
+                ignore=_CACHE_IGNORE,
+            )
+
+            # Replace the cached patterns with the ones requested for this clone
+            sparse_checkout_file = git_dir / "info" / "sparse-checkout"
+            sparse_checkout_file.unlink(missing_ok=True)
+            sparse_checkout_file.write_text(
+                "\n".join(self._current_patterns) + "\n"
+                if self._current_patterns
+                else "",
+                encoding="utf-8",
+            )
+        except OSError as e:
+            raise RuntimeError(
+                f"Failed to copy cached clone {cached_git_dir}: {e}"
+            ) from e
+
+        ref = self.repo_branch or "HEAD"
+        try:
+            # Only transfers anything if the branch moved since the clone was cached
+            self._run_git(
+                [
+                    "-C",
+                    str(self.repo_dir),
+                    "fetch",
+                    "--quiet",
+                    "--depth",
+                    "1",
+                    f"--filter={self.filter_spec}",
+                    "origin",
+                    ref,
+                ]
+            )
+            self._run_git(
+                ["-C", str(self.repo_dir), "reset", "--quiet", "--hard", "FETCH_HEAD"]
             )
         except subprocess.CalledProcessError as e:
             raise RuntimeError(
-                f"Failed to clone repository {self.repo_url} (branch: {self.repo_branch}): {e.stderr}"
+                f"Failed to update cached clone of {self.repo_url} (ref: {ref}): "
+                f"{e.stderr}"
             ) from e
 
+    def _store_in_cache(self, cached_git_dir: Path) -> None:
+        """Write the clone to the cache, replacing any older entry, ignoring errors.
+
+        The clone is linked into a temporary directory first and then renamed into
+        place, so other processes never see a partially written cache entry. While an
+        older entry is swapped out, other processes may briefly find no entry and
+        clone from GitHub instead.
+
+        Args:
+            cached_git_dir: The .git directory the clone is cached at.
+        """
+        cache_entry = cached_git_dir.parent
+        try:
+            cache_entry.parent.mkdir(parents=True, exist_ok=True)
+            staging_dir = Path(
+                tempfile.mkdtemp(prefix=f"{cache_entry.name}.", dir=cache_entry.parent)
+            )
+        except OSError:
+            return
+        try:
+            shutil.copytree(
+                self.repo_dir / ".git",
+                staging_dir / ".git",
+                copy_function=_link_or_copy,
+                ignore=_CACHE_IGNORE,
+            )
+            if cache_entry.exists():
+                # Move the older entry aside first, a directory can't be renamed over
+                # a non-empty one
+                os.rename(cache_entry, staging_dir / "previous")
+            os.rename(staging_dir, cache_entry)
+        except OSError:
+            # e.g. another process replaced the same entry first, the cache is optional
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        else:
+            shutil.rmtree(cache_entry / "previous", ignore_errors=True)
+
     def get_default_branch(self) -> str:
         """Retrieve the default branch name for the repository.
 
+        The result is cached, so only the first call queries the remote. If the
+        repository was cloned without a branch, the cloned branch is used directly.
+
         Returns:
             The name of the default branch (e.g., 'main', 'master').
 
         Raises:
             RuntimeError: If unable to query the repository or parse the default branch.
         """
+        if self._default_branch is not None:
+            return self._default_branch
+
         try:
-            result = subprocess.run(
-                [
-                    self.git_bin,
-                    "ls-remote",
-                    "--symref",
-                    self.repo_url,
-                    "HEAD",
-                ],
-                check=True,
-                capture_output=True,
-                text=True,
+            result = self._run_git(
+                ["ls-remote", "--symref", self.repo_url, "HEAD"],
+                capture_stdout=True,
+                text=False,
             )
 
-            for line in result.stdout.splitlines():
-                if line.startswith("ref:"):
-                    branch = line.split()[1].split("/")[-1]
-                    return branch
+            match = _DEFAULT_BRANCH_RE.search(result.stdout)
+            if match:
+                self._default_branch = match.group(1).decode("utf-8")
+                return self._default_branch
             raise RuntimeError(
                 f"Unable to detect the default branch for {self.repo_url}. "
                 "The repository may not exist or may not be accessible."
             )
         except subprocess.CalledProcessError as e:
             raise RuntimeError(
-                f"Failed to query default branch for {self.repo_url}: {e.stderr}"
+                f"Failed to query default branch for {self.repo_url}: "
+                f"{e.stderr.decode('utf-8', errors='replace')}"
             ) from e
 
     def enable_sparse_checkout(self) -> None:
         """Enable sparse checkout for the repository.
 
         This configures git to only checkout files that are explicitly specified
-        in the sparse-checkout configuration.
+        in the sparse-checkout configuration. The clone made by clone_repo() already
+        has sparse checkout enabled, so calling this is not required.
 
         Raises:
             RuntimeError: If the git config operation fails.
         """
         try:
-            subprocess.run(
-                [
-                    self.git_bin,
-                    "-C",
-                    str(self.repo_dir),
-                    "config",
-                    "core.sparseCheckout",
-                    "true",
-                ],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+            self._run_git(
+                ["-C", str(self.repo_dir), "config", "core.sparseCheckout", "true"]
             )
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to enable sparse checkout: {e.stderr}") from e
 
-    def checkout_stuff(self, files_or_dirs: list[str], reset: bool = True) -> None:
+    def checkout_stuff(
+        self, files_or_dirs: list[str], reset: bool = True, defer: bool = False
+    ) -> None:
         """Checkout specific files or directories from the repository.
 
+        If called before clone_repo(), the items are recorded and checked out as part
+        of the clone itself.
+
+        Deferred calls only record the items. They are checked out together with the
+        next non-deferred call, or by flush(), so several calls cost a single git
+        checkout. The result is the same as making the calls one by one: a call with
+        reset=True discards the items recorded before it, and the batch then replaces
+        the sparse-checkout list instead of appending to it.
+
         Args:
             files_or_dirs: List of file or directory paths to checkout, relative to repository root.
             reset: If True, clears the sparse-checkout list before adding new items.
                    If False, appends to the existing sparse-checkout list.
+            defer: If True, only record the items until the next flush.
 
         Raises:
-            RuntimeError: If the git checkout operation fails.
+            ValueError: If archive_paths() was used on this instance.
+            RuntimeError: If the git sparse-checkout operation fails.
             IOError: If unable to write to the sparse-checkout configuration file.
         """
-        sparse_checkout_file = Path(self.repo_dir) / ".git" / "info" / "sparse-checkout"
+        if self._archived:
+            raise ValueError("checkout_stuff() can't be used after archive_paths()")
 
-        try:
-            mode = "w" if reset else "a"
-            with sparse_checkout_file.open(mode, encoding="utf-8") as f:
-                for item in files_or_dirs:
-                    f.write(f"{item}\n")
-        except IOError as e:
-            raise IOError(f"Failed to write sparse-checkout configuration: {e}") from e
+        if reset:
+            # A reset discards everything recorded before it, like a direct call does
+            self._pending = list(dict.fromkeys(files_or_dirs))
+            self._pending_reset = True
+        else:
+            self._pending.extend(
+                item for item in files_or_dirs if item not in self._pending
+            )
+        if not defer:
+            self._apply_pending()
+
+    def flush(self) -> None:
+        """Checkout all items recorded by deferred checkout_stuff() calls.
+
+        Raises:
+            RuntimeError: If the git sparse-checkout operation fails.
+            IOError: If unable to write to the sparse-checkout configuration file.
+        """
+        if self._pending or self._pending_reset:
+            self._apply_pending()
+
+    def _apply_pending(self) -> None:
+        """Checkout the recorded items and clear them."""
+        self._set_sparse_checkout(self._pending, self._pending_reset)
+        self._pending = []
+        self._pending_reset = False
+
+    def _set_sparse_checkout(self, files_or_dirs: list[str], reset: bool) -> None:
+        """Write the sparse-checkout list and update the working tree to match it.
+
+        Args:
+            files_or_dirs: List of file or directory paths to checkout, relative to repository root.
+            reset: If True, replaces the sparse-checkout list, otherwise appends to it.
+
+        Raises:
+            RuntimeError: If the git sparse-checkout operation fails.
+            IOError: If unable to write to the sparse-checkout configuration file.
+        """
+        if reset:
+            patterns = list(files_or_dirs)
+        else:
+            # Skip items already covered by the current patterns, and the checkout
+            # entirely if nothing is left and the working tree is up to date
+            files_or_dirs = [
+                item for item in files_or_dirs if not self._is_checked_out(item)
+            ]
+            if not files_or_dirs and not self._working_tree_stale:
+                return
+            patterns = self._current_patterns + files_or_dirs
+
+        if not self._cloned:
+            # Join the items up front so the file is written with a single call
+            payload = "\n".join(files_or_dirs) + "\n" if files_or_dirs else ""
+            try:
+                if reset:
+                    self._sparse_checkout_file.write_text(payload, encoding="utf-8")
+                elif payload:
+                    with self._sparse_checkout_file.open("a", encoding="utf-8") as f:
+                        f.write(payload)
+            except IOError as e:
+                raise IOError(
+                    f"Failed to write sparse-checkout configuration: {e}"
+                ) from e
+            self._current_patterns = patterns
+            return
 
         try:
-            subprocess.run(
-                [self.git_bin, "-C", str(self.repo_dir), "checkout"],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+            # Write the patterns and update the working tree in a single git call
+            self._run_git(
+                [
+                    "-C",
+                    str(self.repo_dir),
+                    "sparse-checkout",
+                    "set",
+                    "--no-cone",
+                    "--stdin",
+                ],
+                input="\n".join(patterns) + "\n" if patterns else "",
             )
         except subprocess.CalledProcessError as e:
             raise RuntimeError(
                 f"Failed to checkout files/directories: {e.stderr}"
             ) from e
+        self._current_patterns = patterns
+        self._working_tree_stale = False
+
+    def _is_checked_out(self, item: str) -> bool:
+        """Check whether an item is already covered by the current sparse patterns.
+
+        Args:
+            item: The file or directory path, relative to repository root.
+
+        Returns:
+            True if the item or one of its parent directories is already a pattern.
+        """
+        if any(pattern.startswith("!") for pattern in self._current_patterns):
+            # Negated patterns can exclude the item again, so don't guess
+            return False
+        return any(
+            item == pattern or item.startswith(pattern.rstrip("/") + "/")
+            for pattern in self._current_patterns
+        )
+
+    def list_sparse_checkout(self) -> list[str]:
+        """List the patterns currently in the sparse-checkout configuration.
+
+        Returns:
+            The sparse-checkout patterns, in the order they are stored.
+
+        Raises:
+            RuntimeError: If the git sparse-checkout operation fails.
+        """
+        if not self._cloned:
+            content = self._sparse_checkout_file.read_text(encoding="utf-8")
+            return [line for line in content.splitlines() if line]
+
+        try:
+            result = self._run_git(
+                ["-C", str(self.repo_dir), "sparse-checkout", "list"],
+                capture_stdout=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(
+                f"Failed to list sparse-checkout patterns: {e.stderr}"
+            ) from e
+        return [line for line in result.stdout.splitlines() if line]
 
     def reset_sparse_checkout_list(self) -> None:
         """Clear the sparse-checkout configuration file.
 
         This removes all entries from the sparse-checkout list, which will cause
-        subsequent checkouts to remove previously checked out files.
+        subsequent checkouts to remove previously checked out files. Items recorded by
+        deferred checkout_stuff() calls are discarded as well.
 
         Raises:
             IOError: If unable to write to the sparse-checkout configuration file.
         """
-        sparse_checkout_file = Path(self.repo_dir) / ".git" / "info" / "sparse-checkout"
         try:
-            sparse_checkout_file.write_text("", encoding="utf-8")
+            self._sparse_checkout_file.write_text("", encoding="utf-8")
         except IOError as e:
             raise IOError(f"Failed to reset sparse-checkout configuration: {e}") from e
+        self._current_patterns = []
+        self._pending = []
+        self._pending_reset = False
+        # The working tree still has the old items until the next checkout
+        self._working_tree_stale = self._cloned
+
+    @property
+    def _sparse_checkout_file(self) -> Path:
+        """The sparse-checkout file in use, the clone template's one before cloning."""
+        if self._cloned:
+            return self.repo_dir / ".git" / "info" / "sparse-checkout"
+        return self._template_dir / "info" / "sparse-checkout"
+
+    def archive_paths(self, paths: list[str], timeout: float = 60.0) -> Path:
+        """Download specific files or directories without cloning the repository.
+
+        GitHub doesn't support `git archive --remote`, so this streams the tarball of
+        the whole branch from codeload.github.com and only extracts the members under
+        the given paths into repo_dir. Every byte of the repository is still
+        downloaded and decompressed, and everything outside the paths is thrown away.
+        This avoids running git at all, which can pay off for small repositories, but
+        for large ones a sparse partial clone transfers far less data.
+
+        No .git directory is created, so clone_repo() and checkout_stuff() can't be
+        used on this instance afterwards.
+
+        Args:
+            paths: List of file or directory paths to download, relative to repository root.
+            timeout: Seconds to wait on the connection before giving up.
+
+        Returns:
+            The repository directory the items were extracted into.
+
+        Raises:
+            ValueError: If the repository has already been cloned.
+            RuntimeError: If downloading or extracting the archive fails.
+        """
+        if self._cloned:
+            raise ValueError("archive_paths() can't be used after clone_repo()")
+
+        ref = self.repo_branch or "HEAD"
+        url = (
+            f"https://codeload.github.com/{self.repo_owner}/{self.repo_name}"
+            f"/tar.gz/{ref}"
+        )
+        wanted = {path.strip("/") for path in paths}
+        prefixes = tuple(f"{path}/" for path in wanted)
+
+        self.repo_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            with (
+                urllib.request.urlopen(url, timeout=timeout) as response,
+                tarfile.open(fileobj=response, mode="r|gz") as tar,
+            ):
+                for member in tar:
+                    # Drop the "<repo>-<ref>/" directory everything is nested under
+                    name = member.name.partition("/")[2]
+                    if name in wanted or name.startswith(prefixes):
+                        member.name = name
+                        tar.extract(member, self.repo_dir, **_TAR_EXTRACT_KWARGS)
+        except (OSError, tarfile.TarError) as e:
+            raise RuntimeError(
+                f"Failed to download archive of {self.repo_url} (ref: {ref}): {e}"
+            ) from e
+        self._archived = True
+        self._repo_dir_verified = True
+        return self.repo_dir
 
     def get_path_on_disk(self, item_path: str) -> Path:
         """Get the absolute path on disk for a file or directory in the repository.
@@ -222,54 +762,237 @@ class GithubFastDownloader:
             The absolute Path object pointing to the item on disk.
 
         Raises:
-            ValueError: If the repository directory doesn't exist or the item hasn't been checked out.
+            ValueError: If the path is absolute or contains '..', the repository
+                directory doesn't exist or the item hasn't been checked out.
+        """
+        parts = self._item_path_parts(item_path)
+        # Items from deferred checkouts must be on disk before looking them up
+        self.flush()
+        self._verify_repo_dir()
+        full_path = self.repo_dir.joinpath(*parts)
+        try:
+            os.lstat(full_path)
+        except OSError:
+            raise self._missing_item_error(item_path) from None
+        return full_path
+
+    def get_paths_on_disk(self, item_paths: list[str]) -> list[Path]:
+        """Get the absolute paths on disk for several files or directories at once.
+
+        Accepts the same paths as get_path_on_disk(). Each directory on the way to the
+        items is listed only once with os.scandir, instead of checking each item
+        separately. This saves system calls when many items share parent directories,
+        but for a few items, or items in large directories, reading whole listings
+        costs more than calling get_path_on_disk() for each item.
+
+        Args:
+            item_paths: The relative paths to the files or directories within the repository.
+
+        Returns:
+            The absolute Path objects pointing to the items on disk, in the same order.
+
+        Raises:
+            ValueError: If a path is absolute or contains '..', the repository
+                directory doesn't exist or an item hasn't been checked out.
+        """
+        all_parts = [self._item_path_parts(item_path) for item_path in item_paths]
+        # Items from deferred checkouts must be on disk before looking them up
+        self.flush()
+        self._verify_repo_dir()
+
+        listings: dict[str, set[str]] = {}
+
+        def list_dir(rel_dir: str) -> set[str]:
+            if rel_dir not in listings:
+                try:
+                    with os.scandir(self.repo_dir / rel_dir) as entries:
+                        listings[rel_dir] = {entry.name for entry in entries}
+                except OSError:
+                    listings[rel_dir] = set()
+            return listings[rel_dir]
+
+        full_paths = []
+        for item_path, parts in zip(item_paths, all_parts):
+            rel_dir = ""
+            for part in parts:
+                if part not in list_dir(rel_dir):
+                    raise self._missing_item_error(item_path)
+                rel_dir = f"{rel_dir}/{part}" if rel_dir else part
+            full_paths.append(self.repo_dir.joinpath(*parts))
+        return full_paths
+
+    @staticmethod
+    def _item_path_parts(item_path: str) -> tuple[str, ...]:
+        """Split a path relative to the repository root into its components.
+
+        Args:
+            item_path: The relative path to the file or directory within the repository.
+
+        Returns:
+            The path components, with empty and '.' components dropped.
+
+        Raises:
+            ValueError: If the path is absolute or contains '..'.
         """
-        if not self.repo_dir.exists():
-            raise ValueError("Repository directory does not exist")
-        full_path = self.repo_dir / item_path
-        if not full_path.exists():
+        path = PurePosixPath(item_path)
+        if path.is_absolute() or ".." in path.parts:
             raise ValueError(
-                f"File or directory '{item_path}' does not exist in the repository. "
-                "Make sure it has been checked out using checkout_stuff()."
+                f"Path '{item_path}' must be relative to the repository root "
+                "and can't contain '..'"
             )
-        return full_path
+        return path.parts
+
+    def list_checked_out(self) -> list[str]:
+        """List the names of the items checked out at the top level of the repository.
+
+        Use this instead of `repo_dir.iterdir()` to inspect the checkout state. It reads
+        the directory with os.scandir and returns plain names, without creating a Path
+        object per entry. The .git directory is left out.
+
+        Returns:
+            The names of the files and directories at the top level of the repository.
+
+        Raises:
+            ValueError: If the repository directory doesn't exist.
+        """
+        # Items from deferred checkouts must be on disk before listing them
+        self.flush()
+        self._verify_repo_dir()
+        with os.scandir(self.repo_dir) as entries:
+            return [entry.name for entry in entries if entry.name != ".git"]
+
+    def _verify_repo_dir(self) -> None:
+        """Check that the repository directory exists, only hitting the disk once.
 
-    def signal_handler(self, _signum: int, _frame: Any) -> None:
-        """Handle interrupt signals (e.g., Ctrl+C) by cleaning up and exiting.
+        Raises:
+            ValueError: If the repository directory doesn't exist.
+        """
+        if not self._repo_dir_verified:
+            if not self.repo_dir.exists():
+                raise ValueError("Repository directory does not exist")
+            self._repo_dir_verified = True
+
+    @staticmethod
+    def _missing_item_error(item_path: str) -> ValueError:
+        """Build the error for an item that isn't on disk."""
+        return ValueError(
+            f"File or directory '{item_path}' does not exist in the repository. "
+            "Make sure it has been checked out using checkout_stuff()."
+        )
+
+    def object_info(self, ref: str) -> tuple[str, str, int]:
+        """Look up the object name, type and size of an object in the repository.
+
+        Lookups are answered by a single `git cat-file --batch-check` process that is
+        kept running until cleanup(), so repeated lookups don't each pay for starting
+        git and opening the object database.
 
         Args:
-            _signum: The signal number.
-            _frame: The current stack frame.
+            ref: Anything git can resolve to an object, e.g. 'HEAD:path/to/file'.
+
+        Returns:
+            A tuple of the object name (SHA-1), the object type and its size in bytes.
+
+        Raises:
+            ValueError: If the repository hasn't been cloned, the ref contains a line
+                break or the object doesn't exist.
+            RuntimeError: If the git cat-file process exits unexpectedly.
         """
-        self.cleanup()
-        sys.exit(0)
+        if not self._cloned:
+            raise ValueError("Repository has not been cloned")
+        if "\n" in ref or "\r" in ref:
+            # Would send more than one query and leave answers for later calls
+            raise ValueError(f"Ref {ref!r} must not contain line breaks")
+
+        with self._git_batch_lock:
+            if self._git_batch is None:
+                self._git_batch = subprocess.Popen(
+                    [
+                        self.git_bin,
+                        *self._GIT_FAST_OPTS,
+                        "-C",
+                        str(self.repo_dir),
+                        "cat-file",
+                        "--batch-check=%(objectname) %(objecttype) %(objectsize)",
+                    ],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+                )
+                # Registered after the temporary directory's finalizer, so at exit
+                # the process is stopped before its working directory is deleted
+                self._git_batch_finalizer = weakref.finalize(
+                    self, _stop_git_batch, self._git_batch
+                )
+            assert self._git_batch.stdin is not None
+            assert self._git_batch.stdout is not None
+            try:
+                self._git_batch.stdin.write(ref.encode("utf-8") + b"\n")
+                self._git_batch.stdin.flush()
+                line = self._git_batch.stdout.readline()
+            except OSError as e:
+                raise RuntimeError(f"git cat-file exited unexpectedly: {e}") from e
+
+        if not line:
+            raise RuntimeError("git cat-file exited unexpectedly")
+        answer = line.decode("utf-8").rstrip("\n")
+        if answer.endswith((" missing", " ambiguous")):
+            # "<ref> missing" or "<ref> ambiguous", where the ref may contain spaces
+            raise ValueError(f"Object '{ref}' does not exist in the repository")
+        fields = answer.split(" ")
+        if len(fields) != 3 or not fields[2].isdigit():
+            raise RuntimeError(f"Unexpected output from git cat-file: {answer!r}")
+        object_name, object_type, object_size = fields
+        return object_name, object_type, int(object_size)
+
+    def _close_git_batch(self) -> None:
+        """Stop the `git cat-file --batch-check` process, if it was started."""
+        with self._git_batch_lock:
+            if self._git_batch is None:
+                return
+            assert self._git_batch_finalizer is not None
+            self._git_batch_finalizer.detach()
+            self._git_batch_finalizer = None
+            _stop_git_batch(self._git_batch)
+            self._git_batch = None
 
     def cleanup(self) -> None:
         """Clean up the temporary directory containing the cloned repository.
 
+        The directory is first moved aside, so it disappears right away, and then
+        deleted in a background thread so the caller doesn't wait on the disk. Use
+        wait_cleanup() to wait for the deletion to finish. Any deletion still running
+        on interpreter exit is waited for.
+
+        If cleanup() is never called, the directory is deleted when the instance is
+        garbage collected or when the interpreter exits.
+
         This method is safe to call multiple times; subsequent calls after the first
         cleanup will have no effect.
         """
-        if not self._cleaned_up:
-            try:
-                self.temp_dir.cleanup()
-                self._cleaned_up = True
-            except Exception:
-                # Ignore cleanup errors to prevent issues during shutdown
-                pass
-
-    def __del__(self) -> None:
-        """Destructor that ensures cleanup when the object is garbage collected."""
-        self.cleanup()
+        # Detaching the finalizer succeeds only once, and keeps it from running later
+        if self._finalizer.detach() is None:
+            return
+        self._repo_dir_verified = False
+        self._close_git_batch()
+        if self._cloned and self._cache_git_dir is not None:
+            # Write back the clone, with the objects checkouts and fetches have added
+            self._store_in_cache(self._cache_git_dir)
+        self._cleanup_thread = _cleanup_tempdir(self.temp_dir, background=True)
+
+    def wait_cleanup(self) -> None:
+        """Wait for the background deletion started by cleanup() to finish."""
+        if self._cleanup_thread is not None:
+            self._cleanup_thread.join()
 
     def __enter__(self) -> "GithubFastDownloader":
-        """Enter the context manager, cloning the repository and enabling sparse checkout.
+        """Enter the context manager, cloning the repository with sparse checkout enabled.
 
         Returns:
             The GithubFastDownloader instance.
         """
         self.clone_repo()
-        self.enable_sparse_checkout()
         return self
 
     def __exit__(
@@ -50,6 +50,7 @@ def test_simple():
     stuff_in_dir = list(gfd.repo_dir.iterdir())
     assert len(stuff_in_dir) == 1
     assert stuff_in_dir[0].name == ".git"
+    assert gfd.list_checked_out() == []
 
     # Cleanup resources after usage
     gfd.cleanup()
@@ -88,3 +89,175 @@ def test_context_manager():
         stuff_in_dir = list(gfd.repo_dir.iterdir())
         assert len(stuff_in_dir) == 1
         assert stuff_in_dir[0].name == ".git"
+        assert gfd.list_checked_out() == []
+
+
+def test_checkout_before_clone():
+    from github_fast_downloader import GithubFastDownloader
+
+    gfd = GithubFastDownloader("vtr-verilog-to-routing", "verilog-to-routing")
+
+    # Items requested before cloning are checked out as part of the clone itself
+    gfd.checkout_stuff(["vtr_flow/benchmarks/fpu"])
+    with gfd:
+        assert (gfd.repo_dir / "vtr_flow" / "benchmarks" / "fpu").exists()
+        assert not (gfd.repo_dir / "vtr_flow" / "benchmarks" / "blif").exists()
+        assert gfd.list_sparse_checkout() == ["vtr_flow/benchmarks/fpu"]
+        assert gfd.list_checked_out() == ["vtr_flow"]
+
+
+def test_deferred_checkout():
+    from github_fast_downloader import GithubFastDownloader
+
+    with GithubFastDownloader("vtr-verilog-to-routing", "verilog-to-routing") as gfd:
+        # Deferred items are only recorded, nothing is checked out yet
+        gfd.checkout_stuff(["vtr_flow/benchmarks/fpu"], defer=True)
+        gfd.checkout_stuff(["vtr_flow/benchmarks/blif"], reset=False, defer=True)
+        assert not (gfd.repo_dir / "vtr_flow").exists()
+
+        # Flushing checks out all deferred items in one go
+        gfd.flush()
+        assert (gfd.repo_dir / "vtr_flow" / "benchmarks" / "fpu").exists()
+        assert (gfd.repo_dir / "vtr_flow" / "benchmarks" / "blif").exists()
+
+        # Looking up a path also flushes deferred items first
+        gfd.checkout_stuff(
+            ["vtr_flow/benchmarks/vexriscv/VexRiscvSmallest.v"], reset=False, defer=True
+        )
+        assert gfd.get_path_on_disk(
+            "vtr_flow/benchmarks/vexriscv/VexRiscvSmallest.v"
+        ).exists()
+
+        # A reset in the batch discards the items deferred before it
+        gfd.checkout_stuff(["vtr_flow/benchmarks/blif"], reset=False, defer=True)
+        gfd.checkout_stuff(["vtr_flow/benchmarks/fpu"])
+        assert gfd.list_sparse_checkout() == ["vtr_flow/benchmarks/fpu"]
+        assert not (gfd.repo_dir / "vtr_flow" / "benchmarks" / "blif").exists()
+
+        # So does resetting the sparse-checkout list
+        gfd.checkout_stuff(["vtr_flow/benchmarks/blif"], reset=False, defer=True)
+        gfd.reset_sparse_checkout_list()
+        gfd.checkout_stuff(["vtr_flow/benchmarks/vexriscv"], reset=False)
+        assert gfd.list_sparse_checkout() == ["vtr_flow/benchmarks/vexriscv"]
+        assert not (gfd.repo_dir / "vtr_flow" / "benchmarks" / "blif").exists()
+        assert not (gfd.repo_dir / "vtr_flow" / "benchmarks" / "fpu").exists()
+
+
+def test_cleanup():
+    from github_fast_downloader import GithubFastDownloader
+
+    gfd = GithubFastDownloader("vtr-verilog-to-routing", "verilog-to-routing")
+    temp_dir = gfd.repo_dir.parent
+    assert temp_dir.exists()
+
+    # The directory disappears right away, the deletion itself runs in the background
+    gfd.cleanup()
+    assert not temp_dir.exists()
+    gfd.wait_cleanup()
+
+    # Calling cleanup again has no effect
+    gfd.cleanup()
+    gfd.wait_cleanup()
+
+
+def test_archive_paths():
+    import pytest
+
+    from github_fast_downloader import GithubFastDownloader
+
+    gfd = GithubFastDownloader("vtr-verilog-to-routing", "verilog-to-routing")
+
+    # Only the requested items are extracted, and no clone is made
+    gfd.archive_paths(
+        ["vtr_flow/benchmarks/fpu", "vtr_flow/benchmarks/vexriscv/VexRiscvSmallest.v"]
+    )
+    assert (gfd.repo_dir / "vtr_flow" / "benchmarks" / "fpu").exists()
+    assert (
+        gfd.repo_dir / "vtr_flow" / "benchmarks" / "vexriscv" / "VexRiscvSmallest.v"
+    ).exists()
+    assert not (gfd.repo_dir / "vtr_flow" / "benchmarks" / "blif").exists()
+    assert not (gfd.repo_dir / ".git").exists()
+
+    # There is no clone to check out more items into afterwards
+    with pytest.raises(ValueError):
+        gfd.checkout_stuff(["vtr_flow/benchmarks/blif"])
+
+    gfd.cleanup()
+
+
+def test_get_paths_on_disk():
+    import pytest
+
+    from github_fast_downloader import GithubFastDownloader
+
+    with GithubFastDownloader("vtr-verilog-to-routing", "verilog-to-routing") as gfd:
+        gfd.checkout_stuff(["vtr_flow/benchmarks/fpu", "vtr_flow/benchmarks/vexriscv"])
+
+        # Several items are looked up at once, in the order they were given
+        paths = gfd.get_paths_on_disk(
+            [
+                "vtr_flow/benchmarks/vexriscv/VexRiscvSmallest.v",
+                "vtr_flow/benchmarks/fpu",
+            ]
+        )
+        assert paths == [
+            gfd.get_path_on_disk("vtr_flow/benchmarks/vexriscv/VexRiscvSmallest.v"),
+            gfd.get_path_on_disk("vtr_flow/benchmarks/fpu"),
+        ]
+
+        # Items that haven't been checked out are reported like get_path_on_disk()
+        with pytest.raises(ValueError):
+            gfd.get_paths_on_disk(["vtr_flow/benchmarks/blif"])
+
+        # Both reject paths leading outside the repository
+        with pytest.raises(ValueError):
+            gfd.get_path_on_disk("vtr_flow/../../etc")
+        with pytest.raises(ValueError):
+            gfd.get_paths_on_disk(["/etc"])
+
+
+def test_object_info():
+    import pytest
+
+    from github_fast_downloader import GithubFastDownloader
+
+    with GithubFastDownloader("vtr-verilog-to-routing", "verilog-to-routing") as gfd:
+        # Objects can be inspected without checking them out
+        _, object_type, _ = gfd.object_info("HEAD:vtr_flow/benchmarks")
+        assert object_type == "tree"
+        _, object_type, object_size = gfd.object_info(
+            "HEAD:vtr_flow/benchmarks/vexriscv/VexRiscvSmallest.v"
+        )
+        assert object_type == "blob"
+        assert object_size > 0
+
+        # Refs that would send more than one query are rejected
+        with pytest.raises(ValueError):
+            gfd.object_info("HEAD\nHEAD:README")
+        _, object_type, _ = gfd.object_info("HEAD:vtr_flow")
+        assert object_type == "tree"
+
+        # Missing objects are reported, even with spaces in the ref
+        with pytest.raises(ValueError):
+            gfd.object_info("HEAD:nope x")
+
+
+def test_cache_dir(tmp_path):
+    from github_fast_downloader import GithubFastDownloader
+
+    # The first clone is stored in the cache
+    with GithubFastDownloader(
+        "vtr-verilog-to-routing", "verilog-to-routing", cache_dir=tmp_path
+    ) as gfd:
+        gfd.checkout_stuff(["vtr_flow/benchmarks/fpu"])
+        assert (gfd.repo_dir / "vtr_flow" / "benchmarks" / "fpu").exists()
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # The second one is reused from the cache, with its own sparse-checkout list
+    gfd = GithubFastDownloader(
+        "vtr-verilog-to-routing", "verilog-to-routing", cache_dir=tmp_path
+    )
+    gfd.checkout_stuff(["vtr_flow/benchmarks/blif"])
+    with gfd:
+        assert (gfd.repo_dir / "vtr_flow" / "benchmarks" / "blif").exists()
+        assert not (gfd.repo_dir / "vtr_flow" / "benchmarks" / "fpu").exists()